@@ -0,0 +1,135 @@
+"""Benchmark de tempo de importação dos módulos `database`, `services` e `bot`.
+
+Cada medição roda em um interpretador novo (cold start). O script falha se
+alguma dependência pesada for carregada na importação, se a importação criar
+arquivos/diretórios ou se o tempo médio ultrapassar o orçamento.
+
+Um finder sentinela em `sys.meta_path` intercepta as dependências pesadas, de
+modo que a verificação vale mesmo quando elas não estão instaladas. Dependências
+obrigatórias ausentes (ex.: python-telegram-bot) são substituídas por stubs; o
+tempo medido, nesse caso, não inclui o custo delas.
+
+Uso:
+    python benchmarks/startup.py [--runs 10] [--budget-ms 150] [--bot-budget-ms 600]
+"""
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+# (descrição, módulos importados, módulos que não podem ser carregados,
+#  dependência substituída por stub se ausente, argumento com o orçamento)
+PROBES = [
+    ("import database + src.services", ["database", "src.services"],
+     ["openai", "pandas", "dotenv", "httpx"], None, "budget_ms"),
+    # python-telegram-bot já carrega httpx, por isso ele não entra na lista do bot
+    ("import src.bot", ["src.bot"], ["openai", "pandas", "dotenv"], "telegram", "bot_budget_ms"),
+]
+
+PROBE = """
+import importlib, importlib.abc, importlib.machinery, json, sys, time, types
+
+BLOCKED = {heavy!r}
+STUBBED = {stubbed!r}
+attempted = set()
+
+
+class Stub:
+    def __getattr__(self, name):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+
+class StubLoader(importlib.abc.Loader):
+    def create_module(self, spec):
+        module = types.ModuleType(spec.name)
+        module.__path__ = []
+        module.__getattr__ = lambda name: Stub()
+        return module
+
+    def exec_module(self, module):
+        pass
+
+
+class SentinelFinder(importlib.abc.MetaPathFinder):
+    def find_spec(self, name, path, target=None):
+        root = name.partition(".")[0]
+        if root in BLOCKED:
+            attempted.add(root)
+        if root in BLOCKED or root in STUBBED:
+            return importlib.machinery.ModuleSpec(name, StubLoader(), is_package=True)
+        return None
+
+
+sys.meta_path.insert(0, SentinelFinder())
+start = time.perf_counter()
+for module in {modules!r}:
+    importlib.import_module(module)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "heavy": sorted(attempted)}}))
+"""
+
+
+def run_probe(cwd, modules, heavy, stubbed):
+    env = dict(os.environ, PYTHONPATH=str(ROOT_DIR), PYTHONDONTWRITEBYTECODE="1")
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(modules=modules, heavy=heavy, stubbed=stubbed)],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output)
+
+
+def is_installed(module):
+    return importlib.util.find_spec(module) is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    parser.add_argument("--bot-budget-ms", type=float, default=600.0)
+    args = parser.parse_args()
+
+    failed = False
+    for description, modules, heavy, requires, budget_arg in PROBES:
+        stubbed = [requires] if requires and not is_installed(requires) else []
+        if stubbed:
+            print(f"{description}: {requires} não instalado, usando stub (tempo não inclui o pacote)")
+
+        timings = []
+        with tempfile.TemporaryDirectory() as cwd:
+            for _ in range(args.runs):
+                result = run_probe(cwd, modules, heavy, stubbed)
+                if result["heavy"]:
+                    sys.exit(f"{description}: dependências pesadas carregadas na importação: {result['heavy']}")
+                timings.append(result["elapsed"] * 1000)
+            if os.listdir(cwd):
+                sys.exit(f"{description}: a importação criou arquivos no diretório atual: {os.listdir(cwd)}")
+
+        mean = statistics.mean(timings)
+        print(f"{description}: média {mean:.2f} ms, "
+              f"mín {min(timings):.2f} ms, máx {max(timings):.2f} ms ({args.runs} execuções)")
+        budget_ms = getattr(args, budget_arg)
+        if mean > budget_ms:
+            print(f"{description}: tempo médio acima do orçamento de {budget_ms:.0f} ms", file=sys.stderr)
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
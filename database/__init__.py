@@ -1,11 +1,17 @@
+import os
 import sqlite3
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent
+ROOT_DIR = BASE_DIR.parent
 DB_PATH = BASE_DIR / 'youvisa.db'
 
+def get_db_path():
+    """Returns the SQLite file path, configurable via YOUVISA_DB_PATH (relative to the project root)."""
+    return ROOT_DIR / os.getenv('YOUVISA_DB_PATH', DB_PATH)
+
 def get_connection():
-    conn = sqlite3.connect(DB_PATH.as_posix())
+    conn = sqlite3.connect(get_db_path().as_posix())
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -118,6 +124,14 @@ def create_task(user_id, country_id):
     conn.close()
     return task_id
 
+def get_task(task_id):
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
+    task = c.fetchone()
+    conn.close()
+    return task
+
 def get_user_active_task(user_id):
     conn = get_connection()
     c = conn.cursor()
@@ -132,12 +146,17 @@ def get_user_active_task(user_id):
     conn.close()
     return task
 
-def add_document(task_id, doc_type, file_path):
+def add_documents(task_id, documents):
+    """Inserts (doc_type, file_path) pairs in one transaction and returns all task documents."""
     conn = get_connection()
     c = conn.cursor()
-    c.execute('INSERT INTO documents (task_id, doc_type, file_path) VALUES (?, ?, ?)', (task_id, doc_type, file_path))
+    c.executemany('INSERT INTO documents (task_id, doc_type, file_path) VALUES (?, ?, ?)',
+                  [(task_id, doc_type, file_path) for doc_type, file_path in documents])
+    c.execute('SELECT * FROM documents WHERE task_id = ?', (task_id,))
+    docs = c.fetchall()
     conn.commit()
     conn.close()
+    return docs
 
 def get_task_documents(task_id):
     conn = get_connection()
@@ -155,8 +174,9 @@ def update_task_status(task_id, status):
     conn.close()
 
 def get_all_tasks_details():
+    # pandas is imported here so that importing this module stays cheap
+    import pandas as pd
     conn = get_connection()
-    # Returns a pandas-friendly list of dicts or tuples
     query = '''
         SELECT 
             t.id as task_id,
@@ -170,9 +190,7 @@ def get_all_tasks_details():
         JOIN users u ON t.user_id = u.id
         JOIN countries c ON t.country_id = c.id
     '''
-    import pandas as pd
-    return pd.read_sql_query(query, conn)
-
-if __name__ == '__main__':
-    init_db()
-    print("Database initialized.")
+    try:
+        return pd.read_sql_query(query, conn)
+    finally:
+        conn.close()
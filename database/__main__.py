@@ -0,0 +1,8 @@
+from dotenv import load_dotenv
+
+from . import init_db
+
+# Load environment variables (e.g. YOUVISA_DB_PATH) from .env file
+load_dotenv()
+init_db()
+print("Database initialized.")
@@ -4,6 +4,7 @@ from pathlib import Path
 
 import pandas as pd
 import streamlit as st
+from dotenv import load_dotenv
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
@@ -11,6 +12,9 @@ if str(ROOT_DIR) not in sys.path:
 
 import database as db
 
+# Load environment variables (e.g. YOUVISA_DB_PATH) from .env file
+load_dotenv()
+
 st.set_page_config(page_title="Admin YOUVISA", layout="wide")
 
 st.title("Painel Administrativo YOUVISA")
@@ -4,7 +4,6 @@ import os
 import sys
 from pathlib import Path
 
-from dotenv import load_dotenv
 from telegram import ReplyKeyboardMarkup, ReplyKeyboardRemove, Update
 from telegram.ext import (Application, CommandHandler, ContextTypes,
                           ConversationHandler, MessageHandler, filters)
@@ -20,9 +19,6 @@ try:
 except (ImportError, ValueError):
     import services  # Fallback for running as a script
 
-# Load environment variables from .env file
-load_dotenv()
-
 # Enable logging
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
@@ -32,6 +28,9 @@ logger = logging.getLogger(__name__)
 # States
 NAME, CPF, SELECT_COUNTRY, UPLOAD_DOCS = range(4)
 
+# Seconds without new parts before a media group (album) is processed
+MEDIA_GROUP_WINDOW = 1.5
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Starts the conversation and asks for the user's name."""
     user = update.message.from_user
@@ -141,6 +140,11 @@ async def select_country(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     )
     return UPLOAD_DOCS
 
+def missing_documents(uploaded_docs, required_docs):
+    uploaded_types = set([d['doc_type'] for d in uploaded_docs])
+    required_list = set([d.strip() for d in required_docs.split(',')])
+    return required_list - uploaded_types
+
 async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     user = update.message.from_user
     task_id = context.user_data.get('task_id')
@@ -157,18 +161,29 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             await update.message.reply_text("Você não tem uma solicitação ativa. Digite /start para começar.")
             return ConversationHandler.END
 
-    file = await update.message.effective_attachment[-1].get_file() if update.message.photo else await update.message.document.get_file()
+    # An album may have completed the task in the background; checked once per album
+    group_id = update.message.media_group_id
+    if group_id not in context.bot_data.get('media_groups', {}) and db.get_task(task_id)['status'] == "READY":
+        await update.message.reply_text(
+            "Sua solicitação já está pronta para análise. Digite /start para começar uma nova."
+        )
+        return ConversationHandler.END
+
+    attachment = update.message.effective_attachment[-1] if update.message.photo else update.message.document
     
-    file_name = f"{task_id}_{file.file_unique_id}.jpg" # Simplified extension handling
-    file_bytes = await file.download_as_bytearray()
+    if group_id:
+        # Buffer before downloading so slow downloads don't split the album
+        buffer_media_group_part(update, context, task_id, attachment)
+        return UPLOAD_DOCS
     
-    # Save locally
-    saved_path = services.save_file(file_bytes, file_name, user.id)
+    saved_path = await download_attachment(attachment, task_id, user.id)
     
     await update.message.reply_text("Analisando seu documento... Por favor aguarde.")
     
     # Classify
-    doc_type = services.classify_document(saved_path, context.user_data['required_docs'])
+    doc_type = await asyncio.to_thread(
+        services.classify_document, saved_path, context.user_data['required_docs']
+    )
     
     if doc_type == "UNKNOWN" or doc_type == "ERROR":
         await update.message.reply_text(
@@ -177,15 +192,11 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         )
         # Optionally delete the file if rejected
     else:
-        db.add_document(task_id, doc_type, saved_path)
+        uploaded_docs = db.add_documents(task_id, [(doc_type, saved_path)])
         await update.message.reply_text(f"Recebido: {doc_type}!")
         
         # Check if all docs are received
-        uploaded_docs = db.get_task_documents(task_id)
-        uploaded_types = set([d['doc_type'] for d in uploaded_docs])
-        required_list = set([d.strip() for d in context.user_data['required_docs'].split(',')])
-        
-        missing = required_list - uploaded_types
+        missing = missing_documents(uploaded_docs, context.user_data['required_docs'])
         
         if not missing:
             db.update_task_status(task_id, "READY")
@@ -199,6 +210,117 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
     return UPLOAD_DOCS
 
+async def download_attachment(attachment, task_id, user_id):
+    """Downloads a photo/document and saves it in the user's storage directory."""
+    file = await attachment.get_file()
+    
+    file_name = f"{task_id}_{file.file_unique_id}.jpg" # Simplified extension handling
+    file_bytes = await file.download_as_bytearray()
+    
+    # Save locally
+    return services.save_file(file_bytes, file_name, user_id)
+
+def is_image(attachment):
+    mime_type = getattr(attachment, 'mime_type', None)
+    return mime_type is None or mime_type.startswith('image/')  # photos have no mime_type
+
+def buffer_media_group_part(update: Update, context: ContextTypes.DEFAULT_TYPE, task_id, attachment) -> None:
+    """Buffers one part of an album; the first part schedules the processing of the whole group."""
+    media_groups = context.bot_data.setdefault('media_groups', {})
+    group_id = update.message.media_group_id
+    now = asyncio.get_running_loop().time()
+    
+    if group_id in media_groups:
+        media_groups[group_id]['attachments'].append(attachment)
+        media_groups[group_id]['last_part_at'] = now
+        return
+    
+    media_groups[group_id] = {
+        'attachments': [attachment],
+        'last_part_at': now,
+        # Captured now: a /start during the window may switch the active task
+        'required_docs': context.user_data['required_docs'],
+    }
+    context.application.create_task(
+        process_media_group(update, context, group_id, task_id), update=update
+    )
+
+async def process_media_group(update: Update, context: ContextTypes.DEFAULT_TYPE, group_id, task_id) -> None:
+    """Classifies all images of an album in one request and stores them in one transaction."""
+    media_groups = context.bot_data['media_groups']
+    loop = asyncio.get_running_loop()
+    
+    # Wait until no new part has arrived for MEDIA_GROUP_WINDOW seconds
+    while True:
+        await asyncio.sleep(MEDIA_GROUP_WINDOW)
+        if loop.time() - media_groups[group_id]['last_part_at'] >= MEDIA_GROUP_WINDOW:
+            break
+    group = media_groups.pop(group_id)
+    attachments = group['attachments']
+    required_docs = group['required_docs']
+    user_id = update.message.from_user.id
+    
+    await update.message.reply_text(
+        f"Analisando seus {len(attachments)} documentos... Por favor aguarde."
+    )
+    
+    downloads = await asyncio.gather(
+        *(download_attachment(a, task_id, user_id) for a in attachments), return_exceptions=True
+    )
+    parts = []
+    for attachment, result in zip(attachments, downloads):
+        if isinstance(result, Exception):
+            logger.warning("Failed to download album part %s: %s", attachment.file_unique_id, result)
+        else:
+            parts.append((attachment, result))
+    # Failed downloads are reported as rejected parts instead of dropping the album
+    failed_downloads = len(attachments) - len(parts)
+    paths = [path for _, path in parts]
+    
+    # Images go in a single Vision request; other files (e.g. PDFs) are classified one by one
+    image_indexes = [i for i, (attachment, _) in enumerate(parts) if is_image(attachment)]
+    doc_types = [None] * len(paths)
+    if image_indexes:
+        image_types = await asyncio.to_thread(
+            services.classify_documents, [paths[i] for i in image_indexes], required_docs
+        )
+        for i, doc_type in zip(image_indexes, image_types):
+            doc_types[i] = doc_type
+    for i, path in enumerate(paths):
+        if doc_types[i] is None:
+            doc_types[i] = await asyncio.to_thread(services.classify_document, path, required_docs)
+    
+    accepted = [(doc_type, path) for doc_type, path in zip(doc_types, paths)
+                if doc_type not in ("UNKNOWN", "ERROR")]
+    rejected = len(paths) - len(accepted)
+    
+    lines = []
+    if accepted:
+        uploaded_docs = db.add_documents(task_id, accepted)
+        lines.append(f"Recebido: {', '.join(doc_type for doc_type, _ in accepted)}!")
+    else:
+        uploaded_docs = db.get_task_documents(task_id)
+    if rejected:
+        lines.append(
+            f"Não consegui identificar {rejected} documento(s) como um dos necessários. "
+            f"Por favor certifique-se que são de: {required_docs} e tente novamente."
+        )
+    if failed_downloads:
+        lines.append(f"Não consegui baixar {failed_downloads} documento(s). Por favor envie-os novamente.")
+    
+    missing = missing_documents(uploaded_docs, required_docs)
+    if not missing:
+        # The next update in UPLOAD_DOCS sees the READY status and ends the conversation
+        db.update_task_status(task_id, "READY")
+        lines.append(
+            "Parabéns! Recebemos todos os seus documentos. "
+            "Sua solicitação está pronta para análise."
+        )
+    else:
+        lines.append(f"Ainda falta: {', '.join(missing)}")
+    
+    await update.message.reply_text("\n".join(lines))
+
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     await update.message.reply_text("Operação cancelada.", reply_markup=ReplyKeyboardRemove())
     return ConversationHandler.END
@@ -227,6 +349,9 @@ async def chat(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
 def main() -> None:
     """Run the bot."""
+    # Load environment variables from .env file
+    services.load_env()
+
     # Get token from env
     token = os.getenv("TELEGRAM_TOKEN")
     if not token:
@@ -246,6 +371,7 @@ def main() -> None:
             ],
         },
         fallbacks=[CommandHandler("cancel", cancel)],
+        allow_reentry=True,
     )
 
     application.add_handler(conv_handler)
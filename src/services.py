@@ -1,11 +1,20 @@
 import os
 import base64
-from dotenv import load_dotenv
-from openai import OpenAI
+import json
 import shutil
+from pathlib import Path
 
-# Load environment variables from .env file
-load_dotenv()
+# Heavy dependencies (python-dotenv, openai) are imported lazily so that
+# importing this module stays cheap and has no side effects.
+_env_loaded = False
+
+def load_env():
+    """Load environment variables from the .env file (only once)."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
 
 # Initialize OpenAI client lazily
 # Assumes OPENAI_API_KEY is set in environment variables
@@ -15,25 +24,29 @@ def get_client():
     """Get or initialize the OpenAI client."""
     global client
     if client is None:
+        load_env()
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError(
                 "OPENAI_API_KEY environment variable is not set. "
                 "Please set it before using OpenAI services."
             )
+        from openai import OpenAI
         client = OpenAI(api_key=api_key)
     return client
 
+ROOT_DIR = Path(__file__).resolve().parents[1]
 STORAGE_DIR = "storage"
 
-if not os.path.exists(STORAGE_DIR):
-    os.makedirs(STORAGE_DIR)
+def get_storage_dir():
+    """Returns the storage directory, configurable via YOUVISA_STORAGE_DIR (relative to the project root)."""
+    load_env()
+    return os.path.join(ROOT_DIR, os.getenv("YOUVISA_STORAGE_DIR", STORAGE_DIR))
 
 def save_file(file_bytes, file_name, user_id):
     """Saves a file to the local storage directory organized by user_id."""
-    user_dir = os.path.join(STORAGE_DIR, str(user_id))
-    if not os.path.exists(user_dir):
-        os.makedirs(user_dir)
+    user_dir = os.path.join(get_storage_dir(), str(user_id))
+    os.makedirs(user_dir, exist_ok=True)
     
     file_path = os.path.join(user_dir, file_name)
     with open(file_path, "wb") as f:
@@ -50,8 +63,6 @@ def classify_document(file_path, required_docs):
     Uses OpenAI Vision to classify the document against the list of required documents.
     Returns the matching document type or None if not found.
     """
-    base64_image = encode_image(file_path)
-    
     prompt = f"""
     Você é um classificador de documentos para um sistema de vistos.
     Os documentos necessários são: {required_docs}.
@@ -63,6 +74,7 @@ def classify_document(file_path, required_docs):
     """
 
     try:
+        base64_image = encode_image(file_path)
         response = get_client().chat.completions.create(
             model="gpt-4o",
             messages=[
@@ -94,6 +106,63 @@ def classify_document(file_path, required_docs):
         print(f"Error calling OpenAI: {e}")
         return "ERROR"
 
+def classify_documents(file_paths, required_docs):
+    """
+    Uses OpenAI Vision to classify several images in a single request.
+    Returns a list with one document type per image, in the same order.
+    If the request fails every image is "ERROR"; if the answer is malformed,
+    each image is classified on its own with classify_document.
+    """
+    if len(file_paths) == 1:
+        return [classify_document(file_paths[0], required_docs)]
+
+    prompt = f"""
+    Você é um classificador de documentos para um sistema de vistos.
+    Os documentos necessários são: {required_docs}.
+    
+    Você receberá {len(file_paths)} imagens numeradas. Para cada imagem, verifique
+    se ela se parece com um dos documentos necessários.
+    
+    Retorne APENAS uma lista JSON com {len(file_paths)} itens, na mesma ordem das imagens,
+    contendo o nome exato do tipo de documento da lista ou "UNKNOWN" se não estiver claro.
+    Exemplo: ["Passaporte", "UNKNOWN"]
+    """
+
+    try:
+        content = [{"type": "text", "text": prompt}]
+        for index, file_path in enumerate(file_paths, start=1):
+            content.append({"type": "text", "text": f"Imagem {index}:"})
+            content.append({
+                "type": "image_url",
+                "image_url": {
+                    "url": f"data:image/jpeg;base64,{encode_image(file_path)}"
+                },
+            })
+
+        response = get_client().chat.completions.create(
+            model="gpt-4o",
+            messages=[{"role": "user", "content": content}],
+            max_tokens=300,
+        )
+        result = response.choices[0].message.content.strip()
+    except Exception as e:
+        # Retrying per file would only multiply the load on a failing API
+        print(f"Error calling OpenAI: {e}")
+        return ["ERROR"] * len(file_paths)
+
+    try:
+        # The model sometimes wraps the answer in a markdown code block
+        result = result.removeprefix("```json").removeprefix("```").removesuffix("```").strip()
+        doc_types = json.loads(result)
+        if not isinstance(doc_types, list) or len(doc_types) != len(file_paths):
+            raise ValueError(f"Unexpected classification result: {result}")
+    except ValueError as e:
+        print(f"Malformed batch classification, classifying one by one: {e}")
+        return [classify_document(file_path, required_docs) for file_path in file_paths]
+
+    required_list = [d.strip() for d in required_docs.split(',')]
+    return [d if d in required_list else "UNKNOWN" for d in doc_types]
+
 def chat_with_bot(user_message, user_context=None):
     """
     Chat interface focado em auxiliar o usuário a fornecer informações necessárias.